@@ -0,0 +1,150 @@
+"""Compare primary load with and without secondary read routing.
+
+Needs a local three-node replica set, for example:
+
+    mkdir -p /tmp/rs0-0 /tmp/rs0-1 /tmp/rs0-2
+    mongod --replSet rs0 --port 27017 --dbpath /tmp/rs0-0 --fork --logpath /tmp/rs0-0.log
+    mongod --replSet rs0 --port 27018 --dbpath /tmp/rs0-1 --fork --logpath /tmp/rs0-1.log
+    mongod --replSet rs0 --port 27019 --dbpath /tmp/rs0-2 --fork --logpath /tmp/rs0-2.log
+    mongosh --port 27017 --eval 'rs.initiate({_id: "rs0", members: [
+        {_id: 0, host: "localhost:27017"},
+        {_id: 1, host: "localhost:27018"},
+        {_id: 2, host: "localhost:27019"}]})'
+
+Run with: python bench_read_routing.py [mongodb_url] [iterations]
+
+It seeds a throwaway studier_bridge_bench database, runs the same queries
+as the list endpoints once with every read on the primary and once with the
+routing from read_routing.py, and prints how many reads (find, getMore and
+commands such as the aggregate behind count_documents) each member served on
+that database. It exits with an error if the counters add up to fewer reads
+than the workload issued.
+"""
+import sys
+import time
+from datetime import datetime
+from pymongo import MongoClient
+from pymongo.write_concern import WriteConcern
+from read_routing import read_handle
+
+DEFAULT_URL = "mongodb://localhost:27017,localhost:27018,localhost:27019/?replicaSet=rs0"
+DEFAULT_ITERATIONS = 500
+BENCH_DB = "studier_bridge_bench"
+USER_COUNT = 500
+# Each iteration issues four finds and one count_documents aggregate
+READS_PER_ITERATION = 5
+
+def seed(db):
+    """Fill the bench database and wait for every member to have it"""
+    client = db.client
+    client.drop_database(BENCH_DB)
+    all_members = WriteConcern(w=3)
+
+    users = [{
+        "name": f"User {i}",
+        "email": f"user{i}@example.com",
+        "role": ["mentor", "mentee", "both"][i % 3],
+        "grade": "11",
+        "subjects": ["Algebra", "Chemistry"],
+        "created_at": datetime.utcnow()
+    } for i in range(USER_COUNT)]
+    db.get_collection("users", write_concern=all_members).insert_many(users)
+
+    sessions = [{
+        "mentee_email": f"user{i}@example.com",
+        "mentor_email": f"user{(i + 1) % USER_COUNT}@example.com",
+        "subject": "Algebra",
+        "status": "pending",
+        "created_at": datetime.utcnow()
+    } for i in range(USER_COUNT)]
+    db.get_collection("sessions", write_concern=all_members).insert_many(sessions)
+
+    notifications = [{
+        "user_email": f"user{i % USER_COUNT}@example.com",
+        "message": "New session request",
+        "type": "session_request",
+        "read": i % 2 == 0,
+        "created_at": datetime.utcnow()
+    } for i in range(USER_COUNT * 4)]
+    db.get_collection("notifications", write_concern=all_members).insert_many(notifications)
+
+def member_clients(client):
+    """Direct connections to every replica set member, keyed by host"""
+    status = client.admin.command("replSetGetStatus")
+    return {
+        member["name"]: (member["stateStr"], MongoClient(member["name"], directConnection=True))
+        for member in status["members"]
+    }
+
+def read_ops(member):
+    """Reads this member has served on the bench database, from the per-namespace
+    `top` counters. Scoping to BENCH_DB leaves out the oplog find/getMore that
+    secondaries issue to sync, and the monitoring commands drivers send."""
+    totals = member.admin.command("top")["totals"]
+    return sum(
+        counters[kind]["count"]
+        for namespace, counters in totals.items()
+        if namespace.startswith(f"{BENCH_DB}.")
+        for kind in ("queries", "getmore", "commands")
+    )
+
+def run_workload(db, iterations, mode):
+    """Run the list endpoint queries. mode=None uses the configured routing."""
+    mentors = read_handle(db["users"], "get_mentors", mode)
+    mentees = read_handle(db["users"], "get_mentees", mode)
+    sessions = read_handle(db["sessions"], "get_sessions", mode)
+    notifications = read_handle(db["notifications"], "get_notifications", mode)
+
+    for i in range(iterations):
+        email = f"user{i % USER_COUNT}@example.com"
+        list(mentors.find({"role": {"$in": ["mentor", "both"]}}, {"password": 0}))
+        list(mentees.find({"role": {"$in": ["mentee", "both"]}}, {"password": 0}))
+        list(sessions.find({"$or": [{"mentee_email": email}, {"mentor_email": email}]}))
+        list(notifications.find({"user_email": email}).sort("created_at", -1))
+        notifications.count_documents({"user_email": email, "read": False})
+
+def measure(db, members, iterations, mode):
+    before = {host: read_ops(member) for host, (_, member) in members.items()}
+    start = time.perf_counter()
+    run_workload(db, iterations, mode)
+    elapsed = time.perf_counter() - start
+    after = {host: read_ops(member) for host, (_, member) in members.items()}
+    return elapsed, {host: after[host] - before[host] for host in members}
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_URL
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ITERATIONS
+
+    client = MongoClient(url)
+    db = client[BENCH_DB]
+    seed(db)
+    members = member_clients(client)
+
+    results = {}
+    for label, mode in [("all primary", "primary"), ("routed", None)]:
+        results[label] = measure(db, members, iterations, mode)
+
+    # If the counters don't add up to at least the reads we issued, `top` isn't
+    # reporting what read_ops expects and the comparison below means nothing
+    expected = iterations * READS_PER_ITERATION
+    for label, (_, ops) in results.items():
+        if sum(ops.values()) < expected:
+            client.drop_database(BENCH_DB)
+            sys.exit(f"❌ {label}: counted {sum(ops.values())} reads, expected at least {expected}")
+
+    print(f"{iterations} iterations of the mentors/mentees/sessions/notifications reads\n")
+    for label, (elapsed, ops) in results.items():
+        print(f"{label}: {elapsed:.2f}s")
+        for host, (state, _) in members.items():
+            print(f"  {host:<20} {state:<10} {ops[host]:>8} reads")
+
+    primary = next(host for host, (state, _) in members.items() if state == "PRIMARY")
+    baseline = results["all primary"][1][primary]
+    routed = results["routed"][1][primary]
+    if baseline:
+        print(f"\nPrimary reads: {baseline} -> {routed} ({(baseline - routed) / baseline:.0%} less)")
+
+    client.drop_database(BENCH_DB)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Latency and ranking checks for the typeahead index.
+
+Run with: python bench_search_index.py [user_count]
+
+Builds an index over synthetic users (no MongoDB needed), checks a couple of
+ranking cases that are easy to get wrong, then times single-word, typo and
+two-word queries. Exits non-zero if a check fails or the average latency of
+any query kind goes over MAX_AVERAGE_US.
+"""
+import random
+import string
+import sys
+import time
+from search_index import SearchIndex
+
+DEFAULT_USER_COUNT = 10000
+QUERY_COUNT = 2000
+MAX_AVERAGE_US = 500
+
+FIRST_NAMES = ["john", "jane", "maria", "mohammed", "wei", "aisha", "carlos", "emma", "liam", "olivia",
+               "noah", "ava", "lucas", "mia", "ethan", "sofia", "arjun", "priya", "chen", "fatima"]
+SUBJECTS = ["algebra", "geometry", "calculus", "biology", "chemistry", "physics", "spanish",
+            "french", "history", "english", "statistics", "coding"]
+
+def check_ranking():
+    """Higher scoring users must win even when lots of lower scoring ones match"""
+    failures = []
+
+    index = SearchIndex()
+    index.build(
+        [{"email": f"math{i}@example.com", "name": f"Student {i}", "subjects": ["Math"]} for i in range(300)]
+        + [{"email": "matthew@example.com", "name": "Matthew Lee"}]
+    )
+    if "matthew@example.com" not in [r["email"] for r in index.suggest("mat", 5)]:
+        failures.append("name prefix match lost behind subject matches for 'mat'")
+
+    index = SearchIndex()
+    index.build(
+        [{"email": f"s{i}@example.com", "name": f"Student {i}", "school": "Lincoln High"} for i in range(300)]
+        + [{"email": "best@example.com", "name": "Lincoln High", "school": "Lincoln High"}]
+    )
+    results = index.suggest("lincoln high", 5)
+    if not results or results[0]["email"] != "best@example.com":
+        failures.append("best two-word match not ranked first for 'lincoln high'")
+
+    # Broad prefixes: more than MAX_TERMS_PER_TOKEN terms sort before the right one
+    rnd = random.Random(7)
+    filler = [{
+        "email": f"r{i}@example.com",
+        "name": f"{rnd.choice('ab')}{random_word(rnd)} s{rnd.choice('abcdefgh')}{random_word(rnd)}",
+        "subjects": [f"jo{rnd.choice('abcdefghijklmn')}{random_word(rnd)}"]
+    } for i in range(2000)]
+    index = SearchIndex()
+    index.build(filler + [{"email": "john@example.com", "name": "John Smith"},
+                          {"email": "joseph@example.com", "name": "Joseph Brown"}])
+    if "john@example.com" not in [r["email"] for r in index.suggest("john s", 5)]:
+        failures.append("first name + one letter missed 'John Smith' for 'john s'")
+    if "joseph@example.com" not in [r["email"] for r in index.suggest("jo", 5)]:
+        failures.append("name match 'Joseph' lost behind subject terms for 'jo'")
+
+    return failures
+
+def random_word(rnd):
+    return "".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(4, 8)))
+
+def make_users(count, rnd):
+    last_names = [random_word(rnd) for _ in range(800)]
+    schools = [f"{name} high school" for name in last_names[:120]]
+    return [{
+        "email": f"user{i}@example.com",
+        "name": f"{rnd.choice(FIRST_NAMES)} {rnd.choice(last_names)}",
+        "school": rnd.choice(schools),
+        "subjects": rnd.sample(SUBJECTS, 3)
+    } for i in range(count)]
+
+def swap_typo(word):
+    return word[:2] + word[3] + word[2] + word[4:] if len(word) > 4 else word
+
+def time_queries(index, queries):
+    start = time.perf_counter()
+    for query in queries:
+        index.suggest(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+def main():
+    user_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_USER_COUNT
+    rnd = random.Random(42)
+    users = make_users(user_count, rnd)
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.build(users)
+    print(f"Built index over {user_count} users in {time.perf_counter() - start:.2f}s")
+
+    failures = check_ranking()
+
+    sample = [rnd.choice(users)["name"].split() for _ in range(QUERY_COUNT)]
+    query_kinds = {
+        "single word prefix": [last[:rnd.randint(1, len(last))] for _, last in sample],
+        "subject prefix": [rnd.choice(SUBJECTS)[:rnd.randint(2, 6)] for _ in sample],
+        "typo": [swap_typo(last) for _, last in sample],
+        "two words": [f"{first} {last[:3]}" for first, last in sample],
+        "first name + letter": [f"{first} {last[0]}" for first, last in sample],
+        "school two words": [f"{rnd.choice(users)['school'].split()[0][:4]} high" for _ in sample],
+    }
+    for kind, queries in query_kinds.items():
+        average = time_queries(index, queries)
+        print(f"  {kind:<20} {average:>7.0f} us/query")
+        if average > MAX_AVERAGE_US:
+            failures.append(f"{kind} averaged {average:.0f}us, over {MAX_AVERAGE_US}us")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ All checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from pymongo import MongoClient
 from dotenv import load_dotenv
+from read_routing import read_handle
 import os
 
 load_dotenv()
@@ -19,5 +20,20 @@ sessions_collection = db["sessions"]
 messages_collection = db["messages"]
 notifications_collection = db["notifications"]
 availability_collection = db["availability"]
+migrations_collection = db["migrations"]
+
+# Read handles for routes that can tolerate slightly stale data (see read_routing.py).
+# Read-after-write paths keep using the collections above, which read from the primary.
+mentors_read_collection = read_handle(users_collection, "get_mentors")
+mentees_read_collection = read_handle(users_collection, "get_mentees")
+sessions_read_collection = read_handle(sessions_collection, "get_sessions")
+notifications_read_collection = read_handle(notifications_collection, "get_notifications")
+
+def ensure_indexes():
+    """Create the indexes the app relies on. Called at startup and by the
+    migration scripts rather than on import, so importing stays offline."""
+    # Compound indexes for calendar range queries, one per side of the $or
+    sessions_collection.create_index([("mentor_email", 1), ("start_at", 1)])
+    sessions_collection.create_index([("mentee_email", 1), ("start_at", 1)])
 
 print("✅ Connected to MongoDB successfully!")
\ No newline at end of file
@@ -1,11 +1,15 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
 from dotenv import load_dotenv
 import os
-from database import db, users_collection, sessions_collection, notifications_collection, availability_collection
+from database import db, users_collection, sessions_collection, notifications_collection, availability_collection, ensure_indexes
+from database import mentors_read_collection, mentees_read_collection, sessions_read_collection, notifications_read_collection
 from models import UserSignup, UserLogin
 from auth import hash_password, verify_password, create_access_token
+from scheduling import parse_session_window, parse_range_bound, find_overlaps, get_timezone, as_utc, MAX_SESSION_LENGTH
+from search_index import search_index
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 # Load environment variables
@@ -23,8 +27,33 @@ def create_notification(user_email, message, notification_type):
     }
     notifications_collection.insert_one(notification)
 
+# Helper function to (re)build the typeahead index
+def build_search_index():
+    """Load every user into the search index"""
+    search_index.build(users_collection.find(
+        {},
+        {"email": 1, "name": 1, "school": 1, "role": 1, "subjects": 1, "profile_picture_url": 1}
+    ))
+    print(f"✅ Search index built with {len(search_index)} users")
+
+@asynccontextmanager
+async def lifespan(app):
+    # Don't stop the API from starting if MongoDB isn't reachable yet
+    try:
+        ensure_indexes()
+    except Exception as e:
+        print(f"⚠️ Could not create indexes: {e}")
+
+    # Build the typeahead index once, the write routes keep it current after that.
+    # If this fails, the first search request tries again.
+    try:
+        build_search_index()
+    except Exception as e:
+        print(f"⚠️ Could not build search index: {e}")
+    yield
+
 # Create FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -97,6 +126,7 @@ def signup(user: UserSignup):
         }
         
         result = users_collection.insert_one(user_data)
+        search_index.upsert_user(user_data)
         token = create_access_token({"email": user.email, "user_id": str(result.inserted_id)})
         
         return {
@@ -150,7 +180,7 @@ def login(user: UserLogin):
 @app.get("/api/mentors")
 def get_mentors():
     try:
-        mentors = users_collection.find(
+        mentors = mentors_read_collection.find(
             {"role": {"$in": ["mentor", "both"]}},
             {"password": 0}
         )
@@ -167,6 +197,20 @@ def get_mentors():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Typeahead suggestions over mentor names, schools and subjects
+@app.get("/api/search/suggest")
+def search_suggest(q: str = "", limit: int = Query(10, ge=1, le=50)):
+    try:
+        if not search_index.built:
+            build_search_index()
+        return {
+            "status": "success",
+            "query": q,
+            "results": search_index.suggest(q, limit)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Get user profile
 @app.get("/api/profile/{email}")
 def get_profile(email: str):
@@ -192,6 +236,11 @@ def update_subjects(data: dict):
         if not email:
             raise HTTPException(status_code=400, detail="Email is required")
         
+        if isinstance(subjects, str):
+            subjects = [subjects]
+        if not isinstance(subjects, list):
+            raise HTTPException(status_code=400, detail="Subjects must be a list")
+        
         result = users_collection.update_one(
             {"email": email},
             {"$set": {"subjects": subjects}}
@@ -200,6 +249,12 @@ def update_subjects(data: dict):
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="User not found")
         
+        # Re-index from the full document so a user missing from the index
+        # doesn't come back with a blank name
+        updated_user = users_collection.find_one({"email": email}, {"password": 0})
+        if updated_user:
+            search_index.upsert_user(updated_user)
+        
         return {"status": "success", "message": "Subjects updated successfully"}
     except HTTPException as he:
         raise he
@@ -252,7 +307,7 @@ def create_session_request(data: dict):
 @app.get("/api/sessions/{email}")
 def get_sessions(email: str):
     try:
-        sessions = sessions_collection.find({
+        sessions = sessions_read_collection.find({
             "$or": [
                 {"mentee_email": email},
                 {"mentor_email": email}
@@ -330,6 +385,11 @@ def update_profile(data: dict):
             if data.get("role") not in ["mentor", "mentee", "both"]:
                 raise HTTPException(status_code=400, detail="Invalid role")
             updates["role"] = data.get("role")
+        if data.get("timezone"):
+            try:
+                updates["timezone"] = get_timezone(data.get("timezone")).key
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid timezone")
         
         if data.get("new_password"):
             updates["password"] = hash_password(data.get("new_password"))
@@ -345,8 +405,10 @@ def update_profile(data: dict):
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="User not found")
         
+        # Read back from the primary so the response includes this update
         updated_user = users_collection.find_one({"email": email}, {"password": 0})
         updated_user["_id"] = str(updated_user["_id"])
+        search_index.upsert_user(updated_user)
         
         return {
             "status": "success",
@@ -397,6 +459,7 @@ async def upload_profile_picture(email: str = Form(...), file: UploadFile = File
 
         updated_user = users_collection.find_one({"email": email}, {"password": 0})
         updated_user["_id"] = str(updated_user["_id"])
+        search_index.upsert_user(updated_user)
 
         return {
             "status": "success",
@@ -413,7 +476,7 @@ async def upload_profile_picture(email: str = Form(...), file: UploadFile = File
 @app.get("/api/notifications/{email}")
 def get_notifications(email: str):
     try:
-        notifications = notifications_collection.find(
+        notifications = notifications_read_collection.find(
             {"user_email": email}
         ).sort("created_at", -1)
         
@@ -422,7 +485,7 @@ def get_notifications(email: str):
             notif["_id"] = str(notif["_id"])
             notification_list.append(notif)
         
-        unread_count = notifications_collection.count_documents({
+        unread_count = notifications_read_collection.count_documents({
             "user_email": email,
             "read": False
         })
@@ -534,6 +597,21 @@ def create_scheduled_session_request(data: dict):
         if not mentee_email or not mentor_email or not subject or not scheduled_date or not scheduled_time:
             raise HTTPException(status_code=400, detail="Missing required fields")
         
+        # Date and time are the mentee's wall clock, use their timezone to get UTC
+        timezone_name = data.get("timezone")
+        if not timezone_name:
+            mentee = users_collection.find_one({"email": mentee_email}, {"timezone": 1})
+            timezone_name = mentee.get("timezone") if mentee else None
+        try:
+            tz = get_timezone(timezone_name)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid timezone")
+        
+        try:
+            start_at, end_at = parse_session_window(scheduled_date, scheduled_time, tz)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid scheduled date or time: {e}")
+        
         session_data = {
             "mentee_email": mentee_email,
             "mentor_email": mentor_email,
@@ -541,6 +619,9 @@ def create_scheduled_session_request(data: dict):
             "message": message,
             "scheduled_date": scheduled_date,
             "scheduled_time": scheduled_time,
+            "timezone": tz.key,
+            "start_at": start_at,
+            "end_at": end_at,
             "status": "pending",
             "created_at": datetime.utcnow()
         }
@@ -570,24 +651,23 @@ def create_scheduled_session_request(data: dict):
 @app.get("/api/upcoming-sessions/{email}")
 def get_upcoming_sessions(email: str):
     try:
-        from datetime import datetime, date
-        
-        # Get today's date
-        today = date.today().isoformat()
+        now = datetime.utcnow()
         
-        # Find accepted sessions that are scheduled for today or later
+        # Find accepted sessions that haven't finished yet
         sessions = sessions_collection.find({
             "$or": [
                 {"mentee_email": email},
                 {"mentor_email": email}
             ],
             "status": "accepted",
-            "scheduled_date": {"$gte": today}
-        }).sort("scheduled_date", 1)
+            "end_at": {"$gt": now}
+        }).sort("start_at", 1)
         
         session_list = []
         for session in sessions:
             session["_id"] = str(session["_id"])
+            session["start_at"] = as_utc(session.get("start_at"))
+            session["end_at"] = as_utc(session.get("end_at"))
             
             # Get other person's name
             if session["mentee_email"] == email:
@@ -607,12 +687,75 @@ def get_upcoming_sessions(email: str):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+# Get a user's sessions within a time range, with overlap detection
+@app.get("/api/calendar/{email}")
+def get_calendar(email: str, from_: str = Query(..., alias="from"), to: str = Query(...), tz: str = None):
+    try:
+        # Bare dates and offset-less times are read in the caller's timezone
+        if not tz:
+            user = users_collection.find_one({"email": email}, {"timezone": 1})
+            tz = user.get("timezone") if user else None
+        try:
+            zone = get_timezone(tz)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid timezone")
+        
+        try:
+            range_start = parse_range_bound(from_, zone)
+            range_end = parse_range_bound(to, zone, end_of_day=True)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid from/to value")
+        
+        if range_end <= range_start:
+            raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+        
+        # Sessions overlapping [range_start, range_end). Bounding start_at on both
+        # sides keeps each $or branch on its (email, start_at) index.
+        earliest_start = range_start - MAX_SESSION_LENGTH
+        time_filter = {"$gte": earliest_start, "$lt": range_end}
+        sessions = sessions_collection.find({
+            "$or": [
+                {"mentee_email": email, "start_at": time_filter},
+                {"mentor_email": email, "start_at": time_filter}
+            ],
+            "end_at": {"$gt": range_start},
+            "status": {"$in": ["pending", "accepted"]}
+        }).sort("start_at", 1)
+        
+        session_list = []
+        for session in sessions:
+            session["_id"] = str(session["_id"])
+            session["start_at"] = as_utc(session["start_at"])
+            session["end_at"] = as_utc(session["end_at"])
+            session["role"] = "mentee" if session["mentee_email"] == email else "mentor"
+            session["conflicts_with"] = []
+            session_list.append(session)
+        
+        by_id = {session["_id"]: session for session in session_list}
+        overlaps = find_overlaps(session_list)
+        for first_id, second_id in overlaps:
+            by_id[first_id]["conflicts_with"].append(second_id)
+            by_id[second_id]["conflicts_with"].append(first_id)
+        
+        return {
+            "status": "success",
+            "timezone": zone.key,
+            "from": as_utc(range_start),
+            "to": as_utc(range_end),
+            "sessions": session_list,
+            "overlaps": [list(pair) for pair in overlaps]
+        }
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
     # Get all mentees
 @app.get("/api/mentees")
 def get_mentees():
     try:
         # Find users who are mentees or both
-        mentees = users_collection.find(
+        mentees = mentees_read_collection.find(
             {"role": {"$in": ["mentee", "both"]}},
             {"password": 0}  # Don't send passwords!
         )
@@ -0,0 +1,113 @@
+"""Backfill start_at/end_at on sessions that only have scheduled_date/scheduled_time.
+
+Run with: python migrate_session_times.py [batch_size]
+
+Works through sessions in _id order and saves the last processed _id after
+every batch, so it can be stopped and re-run and will pick up where it left off.
+Once a run has completed, running it again rescans from the start, which
+retries any rows that were skipped because they couldn't be parsed.
+
+Legacy date/time strings are read in the mentee's profile timezone, or
+DEFAULT_TIMEZONE when they don't have one. Sessions whose scheduled_time
+can't be parsed get a whole-day window and all_day: true so they still show
+up in upcoming sessions and the calendar.
+"""
+import sys
+from pymongo import UpdateOne
+from database import users_collection, sessions_collection, migrations_collection, ensure_indexes
+from scheduling import parse_session_window, parse_session_day, day_window, get_timezone
+
+MIGRATION_NAME = "session_times_backfill"
+DEFAULT_BATCH_SIZE = 500
+
+def session_timezone(session, cache):
+    """Timezone a legacy session was booked in, cached per mentee"""
+    if session.get("timezone"):
+        return get_timezone(session["timezone"])
+    email = session.get("mentee_email")
+    if email not in cache:
+        mentee = users_collection.find_one({"email": email}, {"timezone": 1})
+        try:
+            cache[email] = get_timezone(mentee.get("timezone") if mentee else None)
+        except ValueError:
+            cache[email] = get_timezone()
+    return cache[email]
+
+def run(batch_size: int = DEFAULT_BATCH_SIZE):
+    ensure_indexes()
+    timezones = {}
+    checkpoint = migrations_collection.find_one({"name": MIGRATION_NAME}) or {}
+    if checkpoint.get("completed"):
+        # A finished run starts over so rows that failed before (and have
+        # since been fixed) get another go; done rows are skipped by the query
+        checkpoint = {}
+        migrations_collection.update_one(
+            {"name": MIGRATION_NAME},
+            {"$set": {"completed": False, "updated": 0, "failed": 0}, "$unset": {"last_id": ""}}
+        )
+    last_id = checkpoint.get("last_id")
+    updated = checkpoint.get("updated", 0)
+    failed = checkpoint.get("failed", 0)
+
+    while True:
+        query = {
+            "scheduled_date": {"$exists": True},
+            "start_at": {"$exists": False}
+        }
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        batch = list(
+            sessions_collection.find(
+                query, {"scheduled_date": 1, "scheduled_time": 1, "mentee_email": 1, "timezone": 1}
+            )
+            .sort("_id", 1)
+            .limit(batch_size)
+        )
+        if not batch:
+            break
+
+        operations = []
+        for session in batch:
+            try:
+                tz = session_timezone(session, timezones)
+                fields = {"timezone": tz.key}
+                try:
+                    fields["start_at"], fields["end_at"] = parse_session_window(
+                        session.get("scheduled_date"), session.get("scheduled_time"), tz
+                    )
+                except ValueError:
+                    # Free text like "afternoon": keep the session on its day
+                    day = parse_session_day(session.get("scheduled_date"), tz)
+                    fields["start_at"], fields["end_at"] = day_window(day, tz)
+                    fields["all_day"] = True
+            except ValueError as e:
+                failed += 1
+                print(f"⚠️ Skipping session {session['_id']}: {e}")
+                continue
+            operations.append(UpdateOne(
+                {"_id": session["_id"], "start_at": {"$exists": False}},
+                {"$set": fields}
+            ))
+
+        if operations:
+            result = sessions_collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+
+        last_id = batch[-1]["_id"]
+        migrations_collection.update_one(
+            {"name": MIGRATION_NAME},
+            {"$set": {"last_id": last_id, "updated": updated, "failed": failed}},
+            upsert=True
+        )
+        print(f"Processed up to {last_id} ({updated} updated, {failed} skipped)")
+
+    migrations_collection.update_one(
+        {"name": MIGRATION_NAME},
+        {"$set": {"completed": True}},
+        upsert=True
+    )
+    print(f"✅ Session time backfill done: {updated} updated, {failed} skipped")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BATCH_SIZE)
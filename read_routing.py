@@ -0,0 +1,55 @@
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+import os
+
+READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+# Listing/history routes that are fine with slightly stale data.
+# Anything not listed here reads from the primary.
+DEFAULT_ROUTE_READ_PREFERENCES = {
+    "get_mentors": "secondaryPreferred",
+    "get_mentees": "secondaryPreferred",
+    "get_sessions": "secondaryPreferred",
+    "get_notifications": "secondaryPreferred"
+}
+
+# MongoDB won't accept less than 90 seconds here
+DEFAULT_MAX_STALENESS_SECONDS = 90
+
+def route_read_preference(route: str):
+    """Read preference mode for a route. Override one route with e.g.
+    MONGODB_READ_PREFERENCE_GET_MENTORS=primary, or every route with
+    MONGODB_READ_PREFERENCE=primary."""
+    return (
+        os.getenv(f"MONGODB_READ_PREFERENCE_{route.upper()}")
+        or os.getenv("MONGODB_READ_PREFERENCE")
+        or DEFAULT_ROUTE_READ_PREFERENCES.get(route, "primary")
+    )
+
+def read_handle(collection, route: str, mode: str = None):
+    """Collection handle to use for reads in `route`. Primary reads get the
+    collection back unchanged; anything else gets a handle with the read
+    preference, maxStalenessSeconds and a "local" read concern set."""
+    mode = mode or route_read_preference(route)
+    if mode not in READ_PREFERENCE_MODES:
+        raise ValueError(f"Unknown read preference {mode!r} for route {route!r}")
+    if mode == "primary":
+        return collection
+
+    max_staleness = int(os.getenv("MONGODB_MAX_STALENESS_SECONDS", DEFAULT_MAX_STALENESS_SECONDS))
+    # -1 means no limit; anything else under the minimum would only fail at
+    # server selection, turning every routed request into a 500
+    if max_staleness != -1 and max_staleness < DEFAULT_MAX_STALENESS_SECONDS:
+        raise ValueError(
+            f"MONGODB_MAX_STALENESS_SECONDS must be -1 or at least {DEFAULT_MAX_STALENESS_SECONDS}, got {max_staleness}"
+        )
+    return collection.with_options(
+        read_preference=READ_PREFERENCE_MODES[mode](max_staleness=max_staleness),
+        read_concern=ReadConcern(os.getenv("MONGODB_STALE_READ_CONCERN", "local"))
+    )
@@ -0,0 +1,112 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import os
+
+DEFAULT_SESSION_LENGTH = timedelta(hours=1)
+# Calendar queries rely on no session being longer than this. A whole local
+# day can be 25 hours when DST ends, so leave room for that.
+MAX_SESSION_LENGTH = timedelta(hours=26)
+TIME_FORMATS = ["%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p", "%I %p", "%I%p"]
+
+def get_timezone(name: str = None):
+    """Look up an IANA timezone like "America/New_York". Falls back to
+    DEFAULT_TIMEZONE from the environment, then UTC, when name is empty."""
+    name = name or os.getenv("DEFAULT_TIMEZONE") or "UTC"
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name!r}")
+
+def to_utc(local: datetime, tz):
+    """Convert a wall-clock time in tz to the naive UTC datetime we store"""
+    return local.replace(tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+def as_utc(value):
+    """Mark a stored naive UTC datetime as UTC so the JSON carries +00:00"""
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+def parse_clock_time(value: str):
+    """Parse a time of day like "14:00" or "2:00 PM" """
+    value = value.strip().upper()
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized time: {value!r}")
+
+def parse_session_day(scheduled_date: str, tz):
+    """Calendar day of a session in tz. Takes a bare "2025-01-31" or a full
+    ISO timestamp; timestamps with an offset (e.g. from JS toISOString())
+    are converted to tz first so local midnight stays on the right day."""
+    value = str(scheduled_date or "").strip()
+    if not value:
+        raise ValueError("scheduled_date is required")
+    if len(value) == 10:
+        return date.fromisoformat(value)
+
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(tz)
+    return parsed.date()
+
+def day_window(day: date, tz):
+    """(start_at, end_at) in UTC covering a whole local day"""
+    start = datetime.combine(day, time.min)
+    return to_utc(start, tz), to_utc(start + timedelta(days=1), tz)
+
+def parse_session_window(scheduled_date: str, scheduled_time: str, tz):
+    """Turn a scheduled_date ("2025-01-31") and scheduled_time ("14:00-15:00"),
+    both wall-clock values in tz, into UTC (start_at, end_at) datetimes.
+    Raises ValueError if either can't be parsed, or if the window is empty
+    (e.g. it falls in a DST gap) or longer than MAX_SESSION_LENGTH."""
+    if not scheduled_time:
+        raise ValueError("scheduled_time is required")
+    day = parse_session_day(scheduled_date, tz)
+
+    parts = [p for p in str(scheduled_time).replace("–", "-").split("-") if p.strip()]
+    if len(parts) not in (1, 2):
+        raise ValueError(f"Unrecognized time range: {scheduled_time!r}")
+
+    start_at = datetime.combine(day, parse_clock_time(parts[0]))
+    if len(parts) == 2:
+        end_at = datetime.combine(day, parse_clock_time(parts[1]))
+        # "23:00-00:30" runs past midnight
+        if end_at <= start_at:
+            end_at += timedelta(days=1)
+    else:
+        end_at = start_at + DEFAULT_SESSION_LENGTH
+
+    start_at, end_at = to_utc(start_at, tz), to_utc(end_at, tz)
+    if end_at <= start_at:
+        raise ValueError(f"Session {scheduled_time!r} has no length on {day} in {tz.key}")
+    if end_at - start_at > MAX_SESSION_LENGTH:
+        raise ValueError(f"Session {scheduled_time!r} is longer than {MAX_SESSION_LENGTH}")
+    return start_at, end_at
+
+def parse_range_bound(value: str, tz, end_of_day: bool = False):
+    """Parse a from/to query value into naive UTC. A bare date is a whole
+    local day in tz, and timestamps without an offset are local to tz."""
+    value = value.strip()
+    if len(value) == 10:
+        start, end = day_window(date.fromisoformat(value), tz)
+        return end if end_of_day else start
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        return to_utc(parsed, tz)
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+def find_overlaps(sessions):
+    """Find overlapping pairs in a list of sessions sorted by start_at.
+    Returns a list of (session_id, session_id) tuples."""
+    overlaps = []
+    active = []
+    for session in sessions:
+        # Drop sessions that ended before this one starts
+        active = [s for s in active if s["end_at"] > session["start_at"]]
+        for other in active:
+            overlaps.append((other["_id"], session["_id"]))
+        active.append(session)
+    return overlaps
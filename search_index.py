@@ -0,0 +1,318 @@
+from bisect import bisect_left, insort
+import heapq
+import re
+import sys
+import threading
+import unicodedata
+
+# Higher weight ranks first when a query matches several fields
+FIELD_WEIGHTS = {"name": 3, "subject": 2, "school": 1}
+# Typo tolerance only kicks in once the query is long enough to mean something
+MIN_FUZZY_LENGTH = 3
+# Single-word queries rank at most this many terms per prefix (e.g. one letter),
+# picking the highest weighted and most used ones
+MAX_TERMS_PER_TOKEN = 50
+# Cap on how many users tied at the cut-off score get ranked by name
+MAX_CANDIDATES = 100
+
+WORD_RE = re.compile(r"\w+")
+
+def fold(text: str):
+    """Case-fold and strip accents so "José" matches "jose" """
+    text = unicodedata.normalize("NFKD", str(text).casefold())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+def tokenize(text: str):
+    return WORD_RE.findall(fold(text))
+
+def subject_names(subjects):
+    if isinstance(subjects, (str, dict)):
+        subjects = [subjects]
+    if not isinstance(subjects, (list, tuple)):
+        return []
+    names = []
+    for subject in subjects:
+        if isinstance(subject, dict):
+            subject = subject.get("name") or subject.get("subject") or ""
+        if subject:
+            names.append(str(subject))
+    return names
+
+class SearchIndex:
+    """In-memory prefix index over user names, schools and subjects.
+
+    Terms live in one sorted list so a prefix lookup is a bisect plus a short
+    scan. Each term maps to the user ids indexed under it (weighted by the
+    field it came from), and users are stored once as small tuples keyed by
+    id. The sorted list doubles as a trie: the children of a prefix are found
+    by bisecting past each next character, which is how typo'd prefixes are
+    expanded without keeping any extra structure in memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._terms = []          # sorted, unique folded terms
+        self._postings = {}       # term -> {weight: set of user_ids}, highest weight first
+        self._term_rank = {}      # term -> (highest weight, number of users)
+        self._users = {}          # user_id -> (email, name, school, role, subjects, picture)
+        self._user_terms = {}     # user_id -> ((term, weight), ...) the user is indexed under
+        self._ids = {}            # email -> user_id
+        self._next_id = 0
+        self.built = False
+
+    def build(self, users):
+        """Rebuild the whole index from an iterable of user documents"""
+        with self._lock:
+            self._reset()
+            for user in users:
+                self._upsert(user)
+            self.built = True
+
+    def upsert_user(self, user: dict):
+        """Add a user or merge changed fields into an indexed one. `user` must
+        have an email; any of name/school/role/subjects/profile_picture_url
+        that are missing keep their current values."""
+        with self._lock:
+            self._upsert(user)
+
+    def __len__(self):
+        return len(self._users)
+
+    def suggest(self, query: str, limit: int = 10):
+        """Return up to `limit` users whose terms start with every word in
+        the query, allowing one typo per word. Exact prefix matches rank first."""
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+
+        with self._lock:
+            if len(tokens) == 1:
+                matches = self._match_terms(tokens[0], limit, MAX_TERMS_PER_TOKEN)
+                scores = self._top_scores(self._score_groups(matches), limit)
+            else:
+                scores = self._intersect_scores([self._match_terms(token, limit) for token in tokens])
+
+            users = self._users
+            best = heapq.nsmallest(limit, ((-score, users[user_id][1], user_id) for user_id, score in scores.items()))
+            return [self._to_result(user_id) for _, _, user_id in best]
+
+    def _score_groups(self, matches):
+        """Turn {term: bonus} into (score, user_ids) groups, best score first"""
+        groups = [
+            (weight + bonus, user_ids)
+            for term, bonus in matches.items()
+            for weight, user_ids in self._postings[term].items()
+        ]
+        groups.sort(key=lambda group: group[0], reverse=True)
+        return groups
+
+    def _top_scores(self, groups, limit: int):
+        """Best score for enough users to fill the top `limit`. Groups come
+        best first, so the first time a user is seen is their best score and
+        once `limit` users are in, lower groups can't change the result.
+        Users tied at the cut-off are capped at MAX_CANDIDATES."""
+        scores = {}
+        floor = None
+        for score, user_ids in groups:
+            if floor is not None and score < floor:
+                break
+            for user_id in user_ids:
+                if user_id not in scores:
+                    scores[user_id] = score
+                    if len(scores) >= limit + MAX_CANDIDATES:
+                        return scores
+            if floor is None and len(scores) >= limit:
+                floor = score
+        return scores
+
+    def _intersect_scores(self, token_matches):
+        """Summed scores for users matching every word. Candidates are the
+        users of the rarest word. Each other word filters them, either by
+        intersecting its postings or, for a broad word like a single letter,
+        by checking the few terms each candidate is indexed under."""
+        if not all(token_matches):
+            return {}
+        rank = self._term_rank
+        token_matches = sorted(token_matches, key=lambda matches: sum(rank[term][1] for term in matches))
+
+        scores = {}
+        for score, user_ids in self._score_groups(token_matches[0]):
+            for user_id in user_ids:
+                if user_id not in scores:
+                    scores[user_id] = score
+
+        user_terms = self._user_terms
+        for matches in token_matches[1:]:
+            token_scores = {}
+            if len(matches) <= len(scores):
+                # Few terms: intersect their postings with the candidates
+                remaining = set(scores)
+                for score, user_ids in self._score_groups(matches):
+                    for user_id in user_ids & remaining:
+                        if user_id not in token_scores:
+                            token_scores[user_id] = score
+            else:
+                # Broad word: look it up in each candidate's own terms instead
+                bonus_for = matches.get
+                for user_id in scores:
+                    best = -1
+                    for term, weight in user_terms[user_id]:
+                        bonus = bonus_for(term)
+                        if bonus is not None and weight + bonus > best:
+                            best = weight + bonus
+                    if best >= 0:
+                        token_scores[user_id] = best
+            if not token_scores:
+                return {}
+            scores = {user_id: scores[user_id] + score for user_id, score in token_scores.items()}
+        return scores
+
+    def _match_terms(self, token: str, limit: int, max_terms: int = None):
+        """Map every term matching one query word to its bonus. With
+        max_terms, broad prefixes keep only their highest ranked terms."""
+        terms = self._prefix_terms(token, max_terms)
+        # Whole-word matches beat prefixes, and both beat typos
+        matches = dict.fromkeys(terms, 5)
+        if token in matches:
+            matches[token] = 10
+
+        # Only fall back to typo matching when exact prefixes come up short.
+        # Every term has at least one user, so only short ranges need counting.
+        if len(token) >= MIN_FUZZY_LENGTH and len(terms) < limit:
+            if sum(self._term_rank[term][1] for term in terms) < limit:
+                for prefix in self._fuzzy_prefixes(token):
+                    for term in self._prefix_terms(prefix, max_terms):
+                        matches.setdefault(term, 0)
+        return matches
+
+    def _prefix_terms(self, prefix: str, max_terms: int = None):
+        """Indexed terms starting with prefix. Past max_terms, keep the ones
+        with the highest weight, then the most users."""
+        start = bisect_left(self._terms, prefix)
+        end = bisect_left(self._terms, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+        terms = self._terms[start:end]
+        if max_terms is not None and len(terms) > max_terms:
+            top = heapq.nlargest(max_terms, terms, key=self._term_rank.__getitem__)
+            if prefix in self._postings and prefix not in top:
+                top.append(prefix)
+            terms = top
+        return terms
+
+    def _children(self, prefix: str):
+        """Distinct characters that follow `prefix` in some indexed term"""
+        terms = self._terms
+        i = bisect_left(terms, prefix)
+        size = len(prefix)
+        while i < len(terms) and terms[i].startswith(prefix):
+            if len(terms[i]) == size:
+                i += 1
+                continue
+            ch = terms[i][size]
+            yield ch
+            # Skip every term sharing prefix + ch
+            i = bisect_left(terms, prefix + chr(ord(ch) + 1), i)
+
+    def _fuzzy_prefixes(self, token: str):
+        """Candidate prefixes one edit (insert, delete, substitution or swap)
+        away from `token`. The first character is assumed to be right, which
+        keeps the expansion small and matches how people mistype."""
+        found = set()
+        for i in range(1, len(token)):
+            head = token[:i]
+            # Extra character typed at position i
+            found.add(head + token[i + 1:])
+            # Walking deeper is pointless once nothing continues past head
+            children = list(self._children(head))
+            if not children:
+                break
+            if i + 1 < len(token):
+                found.add(head + token[i + 1] + token[i] + token[i + 2:])
+            for ch in children:
+                found.add(head + ch + token[i + 1:])
+                found.add(head + ch + token[i:])
+        found.discard(token)
+        return found
+
+    def _upsert(self, user: dict):
+        email = user.get("email")
+        if not email:
+            return
+
+        user_id = self._ids.get(email)
+        if user_id is None:
+            user_id = self._next_id
+            self._next_id += 1
+            self._ids[email] = user_id
+            current = (email, "", "", "", (), None)
+        else:
+            current = self._users[user_id]
+            self._unindex(user_id)
+
+        _, name, school, role, subjects, picture = current
+        if "name" in user:
+            name = user.get("name") or ""
+        if "school" in user:
+            school = user.get("school") or ""
+        if "role" in user:
+            role = user.get("role") or ""
+        if "subjects" in user:
+            subjects = tuple(subject_names(user.get("subjects")))
+        if "profile_picture_url" in user:
+            picture = user.get("profile_picture_url")
+
+        self._users[user_id] = (email, name, school, role, subjects, picture)
+
+        weights = {}
+        fields = [("name", name), ("school", school)] + [("subject", s) for s in subjects]
+        for field, text in fields:
+            for term in tokenize(text):
+                weights[term] = max(weights.get(term, 0), FIELD_WEIGHTS[field])
+
+        for term, weight in weights.items():
+            term = sys.intern(term)
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._terms, term)
+            if weight not in postings:
+                postings[weight] = set()
+                # Keep the highest weight first so ranking can stop early
+                self._postings[term] = postings = dict(sorted(postings.items(), reverse=True))
+            postings[weight].add(user_id)
+            self._update_rank(term)
+        self._user_terms[user_id] = tuple(weights.items())
+
+    def _unindex(self, user_id: int):
+        for term, weight in self._user_terms.pop(user_id, ()):
+            postings = self._postings[term]
+            postings[weight].discard(user_id)
+            if not postings[weight]:
+                del postings[weight]
+            if postings:
+                self._update_rank(term)
+                continue
+            # Last user with this term, drop it everywhere
+            del self._postings[term]
+            del self._term_rank[term]
+            del self._terms[bisect_left(self._terms, term)]
+
+    def _update_rank(self, term: str):
+        postings = self._postings[term]
+        self._term_rank[term] = (next(iter(postings)), sum(len(ids) for ids in postings.values()))
+
+    def _to_result(self, user_id: int):
+        email, name, school, role, subjects, picture = self._users[user_id]
+        return {
+            "email": email,
+            "name": name,
+            "school": school,
+            "role": role,
+            "subjects": list(subjects),
+            "profile_picture_url": picture
+        }
+
+# Shared index used by the API
+search_index = SearchIndex()